@@ -6,51 +6,75 @@ Run by the code-jester.yml workflow on pull_request events.
 
 import json
 import os
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from common import (
-    award_xp, call_llm, log, read_prompt, update_stats,
+    award_xp, call_llm, gh_api_get, gh_api_json, log, read_prompt, update_stats,
 )
 
 
+DIFF_BUDGET = 3000  # chars of diff sent to the LLM
+DIFF_TRUNCATED = "\n\n... [diff truncated for brevity] ..."
+REVIEW_MAX_TOKENS = 2000
+
+
 def get_pr_diff(pr_number: int) -> str:
-    """Get PR diff, truncated for token limits."""
+    """Get PR diff, truncated for token limits.
+
+    Reads only as much of the diff as the budget needs instead of
+    buffering the full diff of a large PR.
+    """
     try:
-        result = subprocess.run(
-            ["gh", "pr", "diff", str(pr_number)],
-            capture_output=True, text=True, check=True,
+        diff = gh_api_get(
+            f"/repos/{{repo}}/pulls/{pr_number}",
+            accept="application/vnd.github.v3.diff",
+            # UTF-8 uses up to 4 bytes per char; this always covers
+            # DIFF_BUDGET + 1 whole chars when the diff is longer than that
+            limit=4 * DIFF_BUDGET + 1,
         )
-        diff = result.stdout
-        # Truncate to ~3000 chars to stay within token budget
-        if len(diff) > 3000:
-            diff = diff[:3000] + "\n\n... [diff truncated for brevity] ..."
-        return diff
-    except subprocess.CalledProcessError:
+    except (OSError, RuntimeError):
         return "(Could not fetch diff)"
+    # Truncate to ~3000 chars to stay within token budget
+    if len(diff) > DIFF_BUDGET:
+        diff = diff[:DIFF_BUDGET] + DIFF_TRUNCATED
+    return diff
 
 
 def get_pr_files(pr_number: int) -> list[str]:
     """Get list of changed files."""
     try:
-        result = subprocess.run(
-            ["gh", "pr", "view", str(pr_number),
-             "--json", "files", "--jq", ".files[].path"],
-            capture_output=True, text=True, check=True,
+        files = gh_api_json(
+            f"/repos/{{repo}}/pulls/{pr_number}/files", {"per_page": 20},
         )
-        return result.stdout.strip().split("\n")[:20]
-    except subprocess.CalledProcessError:
+    except (OSError, RuntimeError, json.JSONDecodeError):
         return []
+    return [f["filename"] for f in files]
+
+
+def get_pr_size(pr_number: int) -> int | None:
+    """Total lines changed in the PR, from the API rather than the truncated diff."""
+    try:
+        pr = gh_api_json(f"/repos/{{repo}}/pulls/{pr_number}")
+        return pr["additions"] + pr["deletions"]
+    except (OSError, RuntimeError, KeyError, json.JSONDecodeError):
+        return None
 
 
 def analyze_diff_stats(diff: str) -> dict:
     """Quick heuristic analysis of the diff."""
-    additions = diff.count("\n+") - diff.count("\n+++")
-    deletions = diff.count("\n-") - diff.count("\n---")
+    additions = deletions = 0
+    for line in diff.splitlines():
+        if line.startswith("+"):
+            if not line.startswith("+++"):
+                additions += 1
+        elif line.startswith("-"):
+            if not line.startswith("---"):
+                deletions += 1
 
     stats = {
-        "additions": max(additions, 0),
-        "deletions": max(deletions, 0),
-        "net": max(additions, 0) - max(deletions, 0),
+        "additions": additions,
+        "deletions": deletions,
+        "net": additions - deletions,
         "size": "small",
     }
 
@@ -65,6 +89,11 @@ def analyze_diff_stats(diff: str) -> dict:
     return stats
 
 
+def review_token_budget(changed: int) -> int:
+    """Scale the review's max_tokens with PR size — small PRs get short reviews."""
+    return min(REVIEW_MAX_TOKENS, max(600, changed * 3))
+
+
 def read_file_content(file_path: str) -> str:
     """Read a file from the repo for roasting."""
     try:
@@ -130,10 +159,23 @@ def run_review():
 
     log("Code Jester", f"Reviewing PR #{pr_number}: {pr_title}")
 
-    diff = get_pr_diff(pr_number)
-    files = get_pr_files(pr_number)
+    # Independent API calls — each worker thread gets its own connection
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        diff_future = ex.submit(get_pr_diff, pr_number)
+        files_future = ex.submit(get_pr_files, pr_number)
+        size_future = ex.submit(get_pr_size, pr_number)
+        diff, files = diff_future.result(), files_future.result()
+        changed = size_future.result()
     stats = analyze_diff_stats(diff)
 
+    if changed is not None:
+        max_tokens = review_token_budget(changed)
+    elif diff.endswith(DIFF_TRUNCATED):
+        # The truncated diff undercounts; a cut-off diff means a large PR
+        max_tokens = REVIEW_MAX_TOKENS
+    else:
+        max_tokens = review_token_budget(stats["additions"] + stats["deletions"])
+
     system_prompt = read_prompt("code-jester")
 
     user_message = f"""Review this PR:
@@ -154,7 +196,7 @@ Diff:
 Deliver your Jester's Review now."""
 
     try:
-        response = call_llm(system_prompt, user_message, max_tokens=2000)
+        response = call_llm(system_prompt, user_message, max_tokens=max_tokens)
     except Exception as e:
         log("Code Jester", f"LLM call failed: {e}")
         response = f"""## 🃏 The Jester's Quick Take
@@ -1,15 +1,26 @@
 #!/usr/bin/env python3
 """Common utilities for GitClaw agents."""
 
+import atexit
+import functools
 import hashlib
+import http.client
+import io
 import json
 import os
 import subprocess
 import sys
 import tempfile
+import threading
+import urllib.parse
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the fallback
+    orjson = None
+
 # ── Constants ────────────────────────────────────────────────────────────────
 
 STATE_SCHEMA_VERSION = "1.0.0"
@@ -38,6 +49,7 @@ def get_repo_root() -> Path:
 REPO_ROOT = get_repo_root()
 STATE_FILE = REPO_ROOT / "memory" / "state.json"
 MEMORY_DIR = REPO_ROOT / "memory"
+PROMPTS_DIR = REPO_ROOT / "templates" / "prompts"
 
 # ── State File Management ────────────────────────────────────────────────────
 
@@ -154,6 +166,63 @@ def save_state(state: dict) -> None:
 # Initialize state file at import time
 ensure_state_file()
 
+# ── File Helpers ─────────────────────────────────────────────────────────────
+
+_dirs_created: set[Path] = set()
+
+
+def ensure_dir(path: Path) -> Path:
+    """Create a directory (and parents) once per process."""
+    if path not in _dirs_created:
+        path.mkdir(parents=True, exist_ok=True)
+        _dirs_created.add(path)
+    return path
+
+
+_append_handles: dict[Path, io.TextIOWrapper] = {}
+
+
+def archive_write(path: Path, text: str) -> None:
+    """Append text to an archive file, keeping the handle open for the process.
+
+    Repeated appends in a long-lived process skip the open/close per write;
+    buffered data is flushed when the process exits.
+    """
+    fh = _append_handles.get(path)
+    if fh is None:
+        ensure_dir(path.parent)
+        fh = _append_handles[path] = open(path, "a", buffering=8192)
+    fh.write(text)
+
+
+@atexit.register
+def _close_append_handles() -> None:
+    for fh in _append_handles.values():
+        fh.close()
+    _append_handles.clear()
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Write a text file atomically (see atomic_write_bytes)."""
+    atomic_write_bytes(path, content.encode())
+
+
+def atomic_write_bytes(path: Path, content: bytes) -> None:
+    """Write a file atomically: temp file in the same directory, then rename."""
+    temp_fd, temp_path = tempfile.mkstemp(
+        dir=ensure_dir(path.parent),
+        prefix=f".{path.name}-",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
 # ── Logging ──────────────────────────────────────────────────────────────────
 
 def log(component: str, message: str) -> None:
@@ -165,3 +234,179 @@ def log(component: str, message: str) -> None:
         "message": message,
     }
     print(json.dumps(log_entry), file=sys.stderr)
+
+# ── Prompts ──────────────────────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=None)
+def read_prompt(name: str) -> str:
+    """Read a system prompt template from templates/prompts/.
+
+    Cached for the process lifetime, so agents run in the same process
+    only hit the disk once per prompt.
+    """
+    return (PROMPTS_DIR / f"{name}.md").read_text()
+
+# ── JSON ─────────────────────────────────────────────────────────────────────
+
+def json_loads(data: bytes | str):
+    """Parse JSON, using orjson when available.
+
+    Raises json.JSONDecodeError on invalid input either way (orjson's error
+    subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+# Keep-alive connections per thread, keyed by (scheme, host): reuses the
+# TCP/TLS session across calls instead of a fresh handshake per request.
+_http_local = threading.local()
+
+# What a keep-alive socket the server already closed looks like on reuse
+_STALE_SOCKET_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+_REDIRECT_STATUS = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+
+
+def _http_connection(scheme: str, host: str, timeout: float) -> http.client.HTTPConnection:
+    pool = getattr(_http_local, "pool", None)
+    if pool is None:
+        pool = _http_local.pool = {}
+    conn = pool.get((scheme, host))
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = pool[(scheme, host)] = conn_cls(host, timeout=timeout)
+    else:
+        # Apply this call's timeout to the pooled connection and its socket
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _send_request(
+    conn: http.client.HTTPConnection, method: str, target: str,
+    body: bytes | None, headers: dict,
+) -> http.client.HTTPResponse:
+    """Send a request and return the response, closing conn on any failure.
+
+    A reused keep-alive socket the server has dropped is retried once on a
+    fresh connection; timeouts and failures on a new connection are not.
+    """
+    for attempt in range(2):
+        reused = conn.sock is not None
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            return conn.getresponse()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            if attempt == 0 and reused and isinstance(e, _STALE_SOCKET_ERRORS):
+                continue
+            if isinstance(e, OSError):
+                raise
+            raise OSError(f"HTTP request to {conn.host} failed: {e}") from e
+
+
+def http_request(
+    url: str,
+    method: str = "GET",
+    body: bytes | None = None,
+    headers: dict | None = None,
+    limit: int | None = None,
+    timeout: float = 15,
+) -> tuple[int, bytes]:
+    """Make an HTTP request over a pooled keep-alive connection.
+
+    Returns (status, body). Redirects are followed, up to MAX_REDIRECTS.
+    With `limit`, at most that many bytes of the body are read.
+
+    Raises:
+        OSError: On network failure or too many redirects
+    """
+    headers = dict(headers or {})
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        conn = _http_connection(parts.scheme, parts.netloc, timeout)
+        resp = _send_request(conn, method, target, body, headers)
+        location = resp.getheader("Location")
+        try:
+            if resp.status in _REDIRECT_STATUS and location:
+                resp.read()  # Drain so the connection can be reused
+            elif limit is None:
+                return resp.status, resp.read()
+            else:
+                data = resp.read(limit)
+                if not resp.isclosed():
+                    # Unread body left on the socket; it can't be reused
+                    conn.close()
+                return resp.status, data
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            if isinstance(e, OSError):
+                raise
+            raise OSError(f"HTTP request to {parts.netloc} failed: {e}") from e
+
+        # Follow the redirect the way urllib does
+        url = urllib.parse.urljoin(url, location)
+        if resp.status in (301, 302, 303) and method not in ("GET", "HEAD"):
+            method, body = "GET", None
+        if urllib.parse.urlsplit(url).netloc != parts.netloc:
+            headers.pop("Authorization", None)
+    raise OSError(f"Too many redirects for {url}")
+
+
+# ── GitHub REST API ──────────────────────────────────────────────────────────
+
+GITHUB_API = "https://api.github.com"
+
+
+def gh_api_get(
+    path: str,
+    params: dict | None = None,
+    accept: str = "application/vnd.github+json",
+    limit: int | None = None,
+) -> str:
+    """GET a GitHub REST API path and return the response body as text.
+
+    `path` may contain `{repo}`, filled from GITHUB_REPOSITORY. With `limit`,
+    at most that many bytes of the body are read.
+
+    Raises:
+        RuntimeError: If the API returns an error status
+        OSError: On network failure
+    """
+    path = path.format(repo=os.environ.get("GITHUB_REPOSITORY", ""))
+    if params:
+        path += "?" + urllib.parse.urlencode(params)
+    headers = {
+        "Accept": accept,
+        "User-Agent": "GitClaw",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN", "")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    status, body = http_request(GITHUB_API + path, headers=headers, limit=limit, timeout=30)
+    if status >= 400:
+        raise RuntimeError(f"GitHub API {status} for {path}: {body[:200]!r}")
+    return body.decode("utf-8", errors="replace")
+
+
+def gh_api_json(path: str, params: dict | None = None) -> dict | list:
+    """GET a GitHub REST API path and parse the JSON response."""
+    return json.loads(gh_api_get(path, params))
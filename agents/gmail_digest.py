@@ -79,7 +79,8 @@ def get_todays_files(category: str) -> list:
         if f.name.startswith(today_str) or f.name.startswith(today_str.replace("-", "")):
             # Read first 200 chars for preview
             try:
-                content = f.read_text()[:200].strip()
+                with f.open() as fh:
+                    content = fh.read(200).strip()
             except Exception:
                 content = ""
             files.append({"name": f.name, "preview": content})
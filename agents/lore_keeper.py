@@ -5,13 +5,17 @@ Triggered by /lore command.
 """
 
 import os
+import re
 from pathlib import Path
 
 from common import (
-    MEMORY_DIR, award_xp, call_llm, gh_post_comment,
+    MEMORY_DIR, atomic_write_text, award_xp, call_llm, gh_post_comment,
     log, read_prompt, today, update_stats,
 )
 
+# Anything but letters, digits (any script) and hyphens, like str.isalnum()
+_SLUG_RE = re.compile(r"(?:[^\w-]|_)+")
+
 
 def gather_existing_lore() -> str:
     """Read existing lore entries for narrative continuity."""
@@ -21,7 +25,8 @@ def gather_existing_lore() -> str:
 
     entries = []
     for f in sorted(lore_dir.glob("*.md"))[-5:]:
-        first_line = f.read_text().split("\n")[0].lstrip("# ").strip()
+        with f.open() as fh:
+            first_line = fh.readline().lstrip("# ").strip()
         entries.append(f"- {first_line} ({f.name})")
 
     if not entries:
@@ -35,6 +40,7 @@ def main():
     issue_number = int(os.environ.get("ISSUE_NUMBER", "0"))
 
     log("Lore Keeper", f"Chronicling: {topic}")
+    date_str = today()
 
     existing_lore = gather_existing_lore()
     system_prompt = read_prompt("lore-keeper")
@@ -44,7 +50,7 @@ def main():
 Existing lore entries for continuity:
 {existing_lore}
 
-Date of inscription: {today()}
+Date of inscription: {date_str}
 
 Create a lore entry worthy of the chronicles. Write it as if documenting
 an epic saga — dramatic, but grounded in real technical/project knowledge."""
@@ -66,11 +72,9 @@ The tale of "{topic}" shall be told another day. The scrolls await.
         gh_post_comment(issue_number, response)
 
     # Archive as lore file
-    slug = topic.lower().replace(" ", "-")[:50]
-    slug = "".join(c for c in slug if c.isalnum() or c == "-")
-    lore_file = MEMORY_DIR / "lore" / f"{today()}-{slug}.md"
-    lore_file.parent.mkdir(parents=True, exist_ok=True)
-    lore_file.write_text(response + "\n")
+    slug = _SLUG_RE.sub("", topic.lower().replace(" ", "-"))[:50]
+    lore_file = MEMORY_DIR / "lore" / f"{date_str}-{slug}.md"
+    atomic_write_text(lore_file, response + "\n")
 
     update_stats("lore_entries")
     award_xp(10)
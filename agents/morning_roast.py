@@ -4,48 +4,63 @@ Morning Roast — Daily briefing with coffee-fueled sarcasm.
 Run by the morning-roast.yml workflow on schedule.
 """
 
+import asyncio
 import json
 import os
-import subprocess
 from datetime import datetime, timezone
 
 from common import (
-    award_xp, call_llm, gh_post_comment, load_state,
+    award_xp, call_llm, gh_api_json, gh_post_comment, load_state,
     log, read_prompt, today, update_stats, xp_bar,
 )
 
 
-def get_open_issues() -> list[dict]:
-    """Fetch open issues via gh CLI."""
+async def get_open_issues() -> list[dict]:
+    """Fetch open issues via the GitHub REST API."""
     try:
-        result = subprocess.run(
-            ["gh", "issue", "list", "--state", "open",
-             "--json", "number,title,labels,createdAt", "--limit", "20"],
-            capture_output=True, text=True, check=True,
+        items = await asyncio.to_thread(
+            gh_api_json, "/repos/{repo}/issues",
+            # The endpoint also lists PRs; fetch a full page so 20 issues remain
+            {"state": "open", "per_page": 100},
         )
-        return json.loads(result.stdout)
-    except (subprocess.CalledProcessError, json.JSONDecodeError):
+    except (OSError, RuntimeError, json.JSONDecodeError):
         return []
-
-
-def get_open_prs() -> list[dict]:
-    """Fetch open PRs via gh CLI."""
+    # Drop the PRs and keep the gh issue list shape
+    return [
+        {
+            "number": item["number"],
+            "title": item["title"],
+            "labels": item.get("labels", []),
+            "createdAt": item.get("created_at"),
+        }
+        for item in items if "pull_request" not in item
+    ][:20]
+
+
+async def get_open_prs() -> list[dict]:
+    """Fetch open PRs via the GitHub REST API."""
     try:
-        result = subprocess.run(
-            ["gh", "pr", "list", "--state", "open",
-             "--json", "number,title,createdAt", "--limit", "10"],
-            capture_output=True, text=True, check=True,
+        items = await asyncio.to_thread(
+            gh_api_json, "/repos/{repo}/pulls",
+            {"state": "open", "per_page": 10},
         )
-        return json.loads(result.stdout)
-    except (subprocess.CalledProcessError, json.JSONDecodeError):
+    except (OSError, RuntimeError, json.JSONDecodeError):
         return []
+    return [
+        {
+            "number": item["number"],
+            "title": item["title"],
+            "createdAt": item.get("created_at"),
+        }
+        for item in items
+    ]
 
 
-def build_context() -> str:
+async def build_context() -> str:
     """Build the context string for the morning roast."""
     state = load_state()
-    issues = get_open_issues()
-    prs = get_open_prs()
+    # Issues and PRs are independent API calls — fetch them concurrently
+    issues, prs = await asyncio.gather(get_open_issues(), get_open_prs())
 
     now = datetime.now(timezone.utc)
     day_of_week = now.strftime("%A")
@@ -93,11 +108,14 @@ Generate the Morning Roast briefing now. Make it punchy and caffeinated."""
     return context
 
 
-def main():
+async def async_main():
     log("Morning Roast", "Brewing today's roast...")
 
-    system_prompt = read_prompt("morning-roast")
-    context = build_context()
+    # Read the prompt while the API calls are in flight
+    system_prompt, context = await asyncio.gather(
+        asyncio.to_thread(read_prompt, "morning-roast"),
+        build_context(),
+    )
 
     try:
         response = call_llm(system_prompt, context, max_tokens=1500)
@@ -122,5 +140,9 @@ The coffee machine is broken today (LLM API error), but here's what I can tell y
     print(response)
 
 
+def main():
+    asyncio.run(async_main())
+
+
 if __name__ == "__main__":
     main()
@@ -22,25 +22,37 @@ DIFFICULTY_XP = {
 }
 
 
+# Quest classes in priority order: the first kind whose keyword appears wins
+QUEST_CLASSES = {
+    "bug": ("Bug Slaying 🐛", "medium"),
+    "feature": ("Artifact Forging ✨", "hard"),
+    "docs": ("Scroll Writing 📜", "easy"),
+    "perf": ("Performance Enchantment ⚡", "hard"),
+    "refactor": ("Refactoring Ritual 🔮", "medium"),
+}
+
+# One scan finds every keyword; the lookahead also catches overlapping ones
+CLASSIFY_RE = re.compile(
+    r"(?=(?P<bug>bug|error|crash|fix|broken)"
+    r"|(?P<feature>feature|add|implement|new)"
+    r"|(?P<docs>doc|readme|comment|typo)"
+    r"|(?P<perf>perf|slow|optimize|speed)"
+    r"|(?P<refactor>refactor|clean|restructure))",
+    re.IGNORECASE,
+)
+
+
 def classify_issue(title: str, body: str) -> dict:
     """Quick heuristic classification before LLM call."""
-    text = f"{title} {body}".lower()
-
-    if any(w in text for w in ["bug", "error", "crash", "fix", "broken"]):
-        quest_type = "Bug Slaying 🐛"
-        base_difficulty = "medium"
-    elif any(w in text for w in ["feature", "add", "implement", "new"]):
-        quest_type = "Artifact Forging ✨"
-        base_difficulty = "hard"
-    elif any(w in text for w in ["doc", "readme", "comment", "typo"]):
-        quest_type = "Scroll Writing 📜"
-        base_difficulty = "easy"
-    elif any(w in text for w in ["perf", "slow", "optimize", "speed"]):
-        quest_type = "Performance Enchantment ⚡"
-        base_difficulty = "hard"
-    elif any(w in text for w in ["refactor", "clean", "restructure"]):
-        quest_type = "Refactoring Ritual 🔮"
-        base_difficulty = "medium"
+    found = set()
+    for match in CLASSIFY_RE.finditer(f"{title} {body}"):
+        found.add(match.lastgroup)
+        if match.lastgroup == "bug":
+            break  # Highest priority — nothing can beat it
+
+    for kind, (quest_type, base_difficulty) in QUEST_CLASSES.items():
+        if kind in found:
+            break
     else:
         quest_type = "Mystery Quest 🎲"
         base_difficulty = "medium"
@@ -104,23 +116,28 @@ A new quest has appeared on the board! Brave adventurer, will you answer the cal
         return
 
     # Parse difficulty from response
-    lines = response.strip().split("\n")
+    response = response.strip()
     difficulty = classification["difficulty"]
     xp = DIFFICULTY_XP.get(difficulty, 25)
 
-    # Try to extract JSON metadata from last line
-    for line in reversed(lines):
-        line = line.strip()
+    # Try to extract JSON metadata from the last JSON-looking line; it may sit
+    # before the sign-off or inside a code fence. Walk lines from the end.
+    end = len(response)
+    while end > 0:
+        start = response.rfind("\n", 0, end) + 1
+        line = response[start:end].strip()
         if line.startswith("{") and line.endswith("}"):
             try:
                 meta = json.loads(line)
+            except json.JSONDecodeError:
+                pass
+            else:
                 difficulty = meta.get("difficulty", difficulty)
                 xp = meta.get("xp", DIFFICULTY_XP.get(difficulty, 25))
                 # Remove the JSON line from the response
-                response = "\n".join(l for l in lines if l.strip() != line)
+                response = (response[:start] + response[end + 1:]).rstrip()
                 break
-            except json.JSONDecodeError:
-                pass
+        end = start - 1
 
     # Post the quest
     gh_post_comment(issue_number, response)
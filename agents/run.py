@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Agent Runner — Run several agents in one Python process.
+Saves the interpreter startup and shared imports each separate script pays.
+
+Usage:
+    python3 run.py --agent morning_roast
+    python3 run.py --agent hn-scraper,news-scraper,crypto-quant
+    python3 run.py --agent karen:review,architect:analyze
+"""
+
+import argparse
+import importlib
+import sys
+
+from common import log
+
+
+def run_agent(spec: str) -> int:
+    """Import an agent module lazily and run its main(). Returns an exit code.
+
+    `spec` is `name` or `name:mode`; the mode is passed as the agent's first
+    command-line argument (e.g. `karen:review`, `architect:analyze`).
+    """
+    name, _, mode = spec.strip().partition(":")
+    module_name = name.strip().replace("-", "_")
+    module = importlib.import_module(module_name)
+
+    # Agents read their mode from sys.argv[1], as when run as a script
+    argv = sys.argv
+    sys.argv = [f"{module_name}.py", mode] if mode else [f"{module_name}.py"]
+    try:
+        module.main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        return code
+    finally:
+        sys.argv = argv
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run GitClaw agents in-process.")
+    parser.add_argument(
+        "--agent", required=True,
+        help="Comma-separated agent names, each optionally with a mode "
+             "(e.g. 'hn_scraper,news-scraper,karen:review')",
+    )
+    args = parser.parse_args()
+
+    names = [n for n in args.agent.split(",") if n.strip()]
+    failed = []
+    for name in names:
+        log("Agent Runner", f"Running {name}")
+        try:
+            code = run_agent(name)
+        except Exception as e:
+            log("Agent Runner", f"{name} crashed: {e}")
+            code = 1
+        if code:
+            failed.append(name)
+
+    if failed:
+        log("Agent Runner", f"Failed agents: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,51 +4,168 @@ Solana Builder Agent — Verifiable Solana program builds in GitHub Actions.
 Handles cargo-build-sbf and Anchor builds, outputs artifacts and hashes.
 """
 
+import asyncio
 import hashlib
+import io
+import itertools
 import json
 import os
+import re
 import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 
 from common import (
-    MEMORY_DIR, award_xp, call_llm, gh_post_comment,
+    MEMORY_DIR, atomic_write_text, award_xp, call_llm, gh_post_comment,
     log, read_prompt, today, update_stats,
 )
 
 BUILDS_DIR = MEMORY_DIR / "solana" / "builds"
+BUILD_TIMEOUT = 600  # 10 minutes per build
+OUTPUT_TAIL = 500  # chars kept from the end of each of stdout/stderr
+
+# cargo already parallelizes within a build; cap concurrent builds at core count
+_build_slots = asyncio.Semaphore(os.cpu_count() or 1)
+
+
+async def run_build(cmd: list[str], cwd: Path) -> tuple[int, str, str]:
+    """Run a build command, returning (returncode, stdout, stderr).
+
+    Raises TimeoutError if the build exceeds BUILD_TIMEOUT.
+    """
+    async with _build_slots:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(cwd),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=BUILD_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return (
+            proc.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
+
+_ERROR_RE = re.compile(r"error", re.IGNORECASE)
+_WARNING_RE = re.compile(r"warning", re.IGNORECASE)
+
+
+def grep_lines(pattern: re.Pattern, text: str, limit: int) -> list[str]:
+    """Return the first `limit` lines of text matching pattern."""
+    return list(itertools.islice(
+        (line for line in text.splitlines() if pattern.search(line)), limit,
+    ))
+
+
+# Directories that never contain program sources worth building
+PRUNE_DIRS = {".git", "target", "node_modules", ".anchor", "test-ledger"}
+SOLANA_DEPS = (b"solana-program", b"anchor-lang")
+
+
+def describe_artifact(so_file: Path) -> dict:
+    """Artifact entry for a built program: name, size and SHA-256.
+
+    Size comes from fstat on the handle used for hashing, and the hash is
+    computed incrementally without loading the file into memory.
+    """
+    with open(so_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    return {
+        "name": so_file.name,
+        "size_bytes": size,
+        "sha256": digest,
+    }
+
+
+async def hash_artifacts(target_dir: Path) -> list[dict]:
+    """Describe every .so in target_dir, hashing them in parallel threads.
+
+    hashlib releases the GIL while digesting, so files hash concurrently.
+    """
+    so_files = sorted(target_dir.glob("*.so"))
+    return list(await asyncio.gather(
+        *(asyncio.to_thread(describe_artifact, f) for f in so_files)
+    ))
 
 
 def find_program_dirs(root: Path) -> list[Path]:
     """Find Solana program directories (contain Cargo.toml with solana deps)."""
+    # Fast path: ripgrep does the literal search natively. Ignore files and
+    # hidden dirs are searched like the os.walk fallback; PRUNE_DIRS prunes.
+    try:
+        prune_globs = [arg for d in sorted(PRUNE_DIRS) for arg in ("--glob", f"!{d}")]
+        proc = subprocess.run(
+            ["rg", "-l", "--no-ignore", "--hidden", "--glob", "Cargo.toml", *prune_globs,
+             "-e", "solana-program|anchor-lang", str(root)],
+            capture_output=True, text=True,
+        )
+        # rg exits 1 when nothing matched, 2 on error
+        if proc.returncode in (0, 1):
+            return sorted(Path(line).parent for line in proc.stdout.splitlines())
+    except FileNotFoundError:
+        pass
+
     programs = []
-    for cargo_toml in root.rglob("Cargo.toml"):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in PRUNE_DIRS]
+        if "Cargo.toml" not in filenames:
+            continue
         try:
-            content = cargo_toml.read_text()
-            if "solana-program" in content or "anchor-lang" in content:
-                programs.append(cargo_toml.parent)
-        except Exception:
-            pass
-    return programs
+            with open(os.path.join(dirpath, "Cargo.toml"), "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        if any(dep in content for dep in SOLANA_DEPS):
+            programs.append(Path(dirpath))
+    return sorted(programs)
 
 
-def detect_framework(program_dir: Path) -> str:
-    """Detect if a program uses Anchor or native Solana SDK."""
+# Directory -> whether it holds an Anchor.toml; shared across programs in a monorepo
+_anchor_toml_cache: dict[Path, bool] = {}
+
+
+def find_anchor_root(program_dir: Path) -> Path | None:
+    """Find the nearest directory (up to 5 levels) containing Anchor.toml."""
+    check = program_dir
+    for _ in range(5):
+        has_anchor = _anchor_toml_cache.get(check)
+        if has_anchor is None:
+            has_anchor = (check / "Anchor.toml").exists()
+            _anchor_toml_cache[check] = has_anchor
+        if has_anchor:
+            return check
+        check = check.parent
+    return None
+
+
+def detect_framework(program_dir: Path) -> tuple[str, Path]:
+    """Detect if a program uses Anchor or native Solana SDK.
+
+    Returns (framework, build_root); build_root is the Anchor workspace root
+    for Anchor programs and the program directory itself otherwise.
+    """
+    anchor_root = find_anchor_root(program_dir)
+    if anchor_root is not None:
+        return "anchor", anchor_root
     cargo_toml = program_dir / "Cargo.toml"
     if cargo_toml.exists():
         content = cargo_toml.read_text()
         if "anchor-lang" in content:
-            return "anchor"
-    # Check for Anchor.toml in parent dirs
-    check = program_dir
-    for _ in range(5):
-        if (check / "Anchor.toml").exists():
-            return "anchor"
-        check = check.parent
-    return "native"
+            return "anchor", program_dir
+    return "native", program_dir
 
 
-def build_native(program_dir: Path) -> dict:
+async def build_native(program_dir: Path) -> dict:
     """Build a native Solana program using cargo-build-sbf."""
     log("Solana Builder", f"Building native program: {program_dir}")
 
@@ -62,41 +179,27 @@ def build_native(program_dir: Path) -> dict:
     }
 
     try:
-        proc = subprocess.run(
-            ["cargo", "build-sbf"],
-            cwd=str(program_dir),
-            capture_output=True, text=True,
-            timeout=600,  # 10 minute timeout
+        returncode, stdout, stderr = await run_build(
+            ["cargo", "build-sbf"], program_dir,
         )
 
-        result["build_output"] = proc.stdout + proc.stderr
+        # Only the tail is shown to the LLM; don't hold a noisy log in the result
+        result["build_output"] = stdout[-OUTPUT_TAIL:] + stderr[-OUTPUT_TAIL:]
 
-        if proc.returncode == 0:
+        if returncode == 0:
             result["status"] = "success"
             # Find .so artifacts
             target_dir = program_dir / "target" / "deploy"
             if target_dir.exists():
-                for so_file in target_dir.glob("*.so"):
-                    file_hash = hashlib.sha256(so_file.read_bytes()).hexdigest()
-                    result["artifacts"].append({
-                        "name": so_file.name,
-                        "size_bytes": so_file.stat().st_size,
-                        "sha256": file_hash,
-                    })
+                result["artifacts"].extend(await hash_artifacts(target_dir))
         else:
             result["status"] = "failed"
-            result["errors"] = [
-                line for line in proc.stderr.split("\n")
-                if "error" in line.lower()
-            ][:10]
+            result["errors"] = grep_lines(_ERROR_RE, stderr, 10)
 
         # Extract warnings
-        result["warnings"] = [
-            line for line in proc.stderr.split("\n")
-            if "warning" in line.lower()
-        ][:5]
+        result["warnings"] = grep_lines(_WARNING_RE, stderr, 5)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         result["status"] = "timeout"
         result["errors"] = ["Build timed out after 10 minutes"]
     except FileNotFoundError:
@@ -109,17 +212,10 @@ def build_native(program_dir: Path) -> dict:
     return result
 
 
-def build_anchor(program_dir: Path) -> dict:
-    """Build an Anchor program."""
+async def build_anchor(program_dir: Path, anchor_root: Path) -> dict:
+    """Build an Anchor program from its workspace root."""
     log("Solana Builder", f"Building Anchor program: {program_dir}")
 
-    # Find Anchor.toml root
-    anchor_root = program_dir
-    for _ in range(5):
-        if (anchor_root / "Anchor.toml").exists():
-            break
-        anchor_root = anchor_root.parent
-
     result = {
         "program": program_dir.name,
         "framework": "anchor",
@@ -130,26 +226,18 @@ def build_anchor(program_dir: Path) -> dict:
     }
 
     try:
-        proc = subprocess.run(
-            ["anchor", "build"],
-            cwd=str(anchor_root),
-            capture_output=True, text=True,
-            timeout=600,
+        returncode, stdout, stderr = await run_build(
+            ["anchor", "build"], anchor_root,
         )
 
-        result["build_output"] = proc.stdout + proc.stderr
+        # Only the tail is shown to the LLM; don't hold a noisy log in the result
+        result["build_output"] = stdout[-OUTPUT_TAIL:] + stderr[-OUTPUT_TAIL:]
 
-        if proc.returncode == 0:
+        if returncode == 0:
             result["status"] = "success"
             target_dir = anchor_root / "target" / "deploy"
             if target_dir.exists():
-                for so_file in target_dir.glob("*.so"):
-                    file_hash = hashlib.sha256(so_file.read_bytes()).hexdigest()
-                    result["artifacts"].append({
-                        "name": so_file.name,
-                        "size_bytes": so_file.stat().st_size,
-                        "sha256": file_hash,
-                    })
+                result["artifacts"].extend(await hash_artifacts(target_dir))
                 # Also check for IDL
                 for idl_file in (anchor_root / "target" / "idl").glob("*.json"):
                     result["artifacts"].append({
@@ -159,12 +247,9 @@ def build_anchor(program_dir: Path) -> dict:
                     })
         else:
             result["status"] = "failed"
-            result["errors"] = [
-                line for line in proc.stderr.split("\n")
-                if "error" in line.lower()
-            ][:10]
+            result["errors"] = grep_lines(_ERROR_RE, stderr, 10)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         result["status"] = "timeout"
         result["errors"] = ["Build timed out after 10 minutes"]
     except FileNotFoundError:
@@ -185,48 +270,91 @@ def format_build_report(result: dict) -> str:
         "timeout": "⏰",
     }.get(result["status"], "❓")
 
-    lines = [
-        f"## 🔨 Solana Build Report\n",
-        f"**Program:** {result['program']}\n",
-        f"**Framework:** {result['framework'].title()}\n",
-        f"**Status:** {status_emoji} {result['status'].title()}\n",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        f"## 🔨 Solana Build Report\n"
+        f"**Program:** {result['program']}\n"
+        f"**Framework:** {result['framework'].title()}\n"
+        f"**Status:** {status_emoji} {result['status'].title()}\n"
+    )
 
     if result["artifacts"]:
-        lines.append("\n### Artifacts\n")
+        w("\n### Artifacts\n")
         for artifact in result["artifacts"]:
             size_kb = artifact.get("size_bytes", 0) / 1024
-            lines.append(f"- `{artifact['name']}` ({size_kb:.1f} KB)\n")
+            w(f"- `{artifact['name']}` ({size_kb:.1f} KB)\n")
             if "sha256" in artifact:
-                lines.append(f"  SHA256: `{artifact['sha256'][:16]}...`\n")
+                w(f"  SHA256: `{artifact['sha256'][:16]}...`\n")
 
     if result["warnings"]:
-        lines.append("\n### Warnings\n")
-        for w in result["warnings"][:3]:
-            lines.append(f"- {w.strip()}\n")
+        w("\n### Warnings\n")
+        for warning in result["warnings"][:3]:
+            w(f"- {warning.strip()}\n")
 
     if result["errors"]:
-        lines.append("\n### Errors\n")
-        for e in result["errors"][:5]:
-            lines.append(f"- {e.strip()}\n")
+        w("\n### Errors\n")
+        for error in result["errors"][:5]:
+            w(f"- {error.strip()}\n")
 
-    return "".join(lines)
+    return buf.getvalue()
 
 
-def main():
+async def build_program(program_dir: Path) -> dict:
+    """Detect the framework for a program directory and build it."""
+    framework, build_root = detect_framework(program_dir)
+    if framework == "anchor":
+        return await build_anchor(program_dir, build_root)
+    return await build_native(program_dir)
+
+
+def report_build(result: dict, issue_number: int, build_file: Path) -> None:
+    """Comment on a build result and archive it."""
+    # Format report
+    raw_report = format_build_report(result)
+
+    # Add LLM commentary
+    try:
+        system_prompt = read_prompt("solana-builder")
+        user_message = (
+            f"Build report:\n{raw_report}\n\n"
+            f"Build output (truncated):\n"
+            f"{result.get('build_output', '')}\n\n"
+            f"Add entertaining commentary about this build result."
+        )
+        response = call_llm(system_prompt, user_message, max_tokens=1500)
+    except Exception:
+        response = raw_report + "\n\n— 🔨 *Solana Builder | Verified builds, verified vibes*"
+
+    # Post and archive
+    if issue_number > 0:
+        gh_post_comment(issue_number, response)
+
+    result.pop("build_output", None)  # Don't persist build output
+    atomic_write_text(build_file, json.dumps(result, indent=2) + "\n")
+
+    update_stats("solana_builds")
+    award_xp(20)
+
+    print(response)
+
+
+async def async_main():
     program_path = os.environ.get("PROGRAM_PATH", ".")
     issue_number = int(os.environ.get("ISSUE_NUMBER", "0"))
 
     log("Solana Builder", f"Build requested for: {program_path}")
 
     program_dir = Path(program_path).resolve()
-    if not program_dir.exists():
+    if program_dir.exists():
+        programs = [program_dir]
+    else:
         # Search for programs in repo
         repo_root = Path(os.environ.get("GITHUB_WORKSPACE", "."))
         programs = find_program_dirs(repo_root)
         if programs:
-            program_dir = programs[0]
-            log("Solana Builder", f"Auto-detected program: {program_dir}")
+            log("Solana Builder", f"Auto-detected {len(programs)} program(s): "
+                f"{', '.join(p.name for p in programs)}")
         else:
             response = (
                 "## 🔨 Solana Builder\n\n"
@@ -240,43 +368,32 @@ def main():
             print(response)
             return
 
-    # Detect framework and build
-    framework = detect_framework(program_dir)
-    if framework == "anchor":
-        result = build_anchor(program_dir)
-    else:
-        result = build_native(program_dir)
-
-    # Format report
-    raw_report = format_build_report(result)
-
-    # Add LLM commentary
-    try:
-        system_prompt = read_prompt("solana-builder")
-        user_message = (
-            f"Build report:\n{raw_report}\n\n"
-            f"Build output (truncated):\n"
-            f"{result.get('build_output', '')[:1000]}\n\n"
-            f"Add entertaining commentary about this build result."
-        )
-        response = call_llm(system_prompt, user_message, max_tokens=1500)
-    except Exception:
-        response = raw_report + "\n\n— 🔨 *Solana Builder | Verified builds, verified vibes*"
+    # `anchor build` covers the whole workspace, so build each one only once
+    seen_roots = set()
+    unique_programs = []
+    for program in programs:
+        framework, build_root = detect_framework(program)
+        if framework == "anchor":
+            if build_root in seen_roots:
+                continue
+            seen_roots.add(build_root)
+        unique_programs.append(program)
+    programs = unique_programs
+
+    # Build all programs concurrently, then report sequentially
+    results = await asyncio.gather(*(build_program(p) for p in programs))
 
-    # Post and archive
-    if issue_number > 0:
-        gh_post_comment(issue_number, response)
-
-    BUILDS_DIR.mkdir(parents=True, exist_ok=True)
     ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M")
-    build_file = BUILDS_DIR / f"build-{ts}.json"
-    result.pop("build_output", None)  # Don't persist full output
-    build_file.write_text(json.dumps(result, indent=2) + "\n")
+    for result in results:
+        if len(results) > 1:
+            build_file = BUILDS_DIR / f"build-{ts}-{result['program']}.json"
+        else:
+            build_file = BUILDS_DIR / f"build-{ts}.json"
+        report_build(result, issue_number, build_file)
 
-    update_stats("solana_builds")
-    award_xp(20)
 
-    print(response)
+def main():
+    asyncio.run(async_main())
 
 
 if __name__ == "__main__":
@@ -7,11 +7,18 @@ Fetches current state from Solana RPC, compares to previous snapshot,
 detects notable changes and surfaces them as alerts.
 """
 
+import gzip
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the fallback
+    orjson = None
+
 from agents.shared_utils import (
     MEMORY_DIR,
     award_xp,
@@ -19,24 +26,44 @@ from agents.shared_utils import (
     gh_post_comment,
     log,
     run_shell,
-    today,
     update_stats,
 )
 from integrations.solana_utils import WELL_KNOWN_MINTS, get_balance
 
 SNAPSHOTS_DIR = MEMORY_DIR / "solana" / "snapshots"
 ALERTS_DIR = MEMORY_DIR / "solana" / "alerts"
+NOTABLE_DELTA_SOL = 0.01  # Balance changes above this are alerted on
+
+
+def _json_loads(data: bytes):
+    """Parse JSON, using orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available."""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
 
 
 def load_previous_snapshot() -> dict:
     """Load the most recent monitoring snapshot, with fallback on errors."""
     SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
-    snapshot_files = sorted(SNAPSHOTS_DIR.glob("*.json"))
-    if snapshot_files:
+    # Timestamped names sort chronologically; a single max() pass avoids sorting.
+    # Older snapshots are plain .json, newer ones gzipped.
+    latest = max(
+        (p for p in SNAPSHOTS_DIR.iterdir() if p.name.endswith((".json", ".json.gz"))),
+        key=lambda p: p.name,
+        default=None,
+    )
+    if latest:
         try:
-            return json.loads(snapshot_files[-1].read_text())
-        except json.JSONDecodeError as e:
-            log(f"⚠️  Corrupted snapshot {snapshot_files[-1].name}: {e}", level="warning")
+            if latest.suffix == ".gz":
+                with gzip.open(latest, "rb") as f:
+                    return _json_loads(f.read())
+            return _json_loads(latest.read_bytes())
+        except (json.JSONDecodeError, EOFError) as e:
+            # EOFError: a truncated .json.gz
+            log(f"⚠️  Corrupted snapshot {latest.name}: {e}", level="warning")
             return {}
         except (OSError, IOError) as e:
             log(f"⚠️  Failed to read snapshot: {e}", level="warning")
@@ -44,15 +71,20 @@ def load_previous_snapshot() -> dict:
     return {}
 
 
-def save_snapshot(data: dict) -> Path:
-    """Save current monitoring state snapshot with atomic write."""
+def save_snapshot(data: dict, now: datetime | None = None) -> Path:
+    """Save current monitoring state snapshot with atomic write.
+
+    Snapshots are only machine-read, so they are written compact and
+    gzipped (level 1: cheap, still several times smaller).
+    """
     SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M")
-    path = SNAPSHOTS_DIR / f"snapshot-{ts}.json"
+    ts = (now or datetime.now(timezone.utc)).strftime("%Y%m%d-%H%M")
+    path = SNAPSHOTS_DIR / f"snapshot-{ts}.json.gz"
     try:
         # Atomic write: write to temp, then rename
-        temp_path = path.with_suffix(".json.tmp")
-        temp_path.write_text(json.dumps(data, indent=2) + "\n")
+        temp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(temp_path, "wb", compresslevel=1) as f:
+            f.write(_json_dumps(data))
         temp_path.rename(path)
     except (OSError, IOError) as e:
         log(f"⚠️  Failed to write snapshot: {e}", level="warning")
@@ -79,46 +111,67 @@ def get_watchlist_tokens() -> list[str]:
     return [t.strip().upper() for t in tokens.split(",") if t.strip()]
 
 
+def fetch_balances(addresses: list[str]) -> dict[str, float | Exception]:
+    """Fetch balances one RPC per wallet (concurrently), keeping per-wallet errors."""
+    with ThreadPoolExecutor(max_workers=min(16, len(addresses) or 1)) as ex:
+        futures = {address: ex.submit(get_balance, address) for address in addresses}
+    balances = {}
+    for address, future in futures.items():
+        try:
+            balances[address] = future.result()
+        except Exception as e:
+            balances[address] = e
+    return balances
+
+
 def check_wallets(wallets: list[dict]) -> list[dict]:
-    """Check balances for all watched wallets, continuing on individual failures."""
-    results = []
+    """Check balances for all watched wallets, continuing on individual failures.
+
+    Balances are fetched concurrently; results keep the input order.
+    """
+    to_check = []
     for wallet in wallets:
-        address = wallet.get("address", "")
-        label = wallet.get("label", address[:8])
-        if not address:
+        if not wallet.get("address", ""):
             log(f"⚠️  Wallet missing address, skipping", level="warning")
             continue
-        try:
-            balance = get_balance(address)
-            results.append({
-                "address": address,
-                "label": label,
-                "balance_sol": balance,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            })
-        except Exception as e:
-            log(f"⚠️  Failed to fetch balance for {label}: {e}, skipping", level="warning")
+        to_check.append(wallet)
+
+    # One sweep timestamp shared by every row
+    ts = datetime.now(timezone.utc).isoformat()
+    balances = fetch_balances([w["address"] for w in to_check])
+
+    results = []
+    for wallet in to_check:
+        address = wallet["address"]
+        label = wallet.get("label", address[:8])
+        balance = balances.get(address)
+        if balance is None or isinstance(balance, Exception):
+            log(f"⚠️  Failed to fetch balance for {label}: {balance}, skipping", level="warning")
             continue
+        results.append({
+            "address": address,
+            "label": label,
+            "balance_sol": balance,
+            "timestamp": ts,
+        })
     return results
 
 
 def detect_notable_changes(prev: dict, current: list[dict]) -> list[dict]:
     """Compare current balances to previous snapshot, find notable deltas."""
-    changes = []
     prev_balances = {w["address"]: w.get("balance_sol", 0) for w in prev.get("wallets", [])}
+    get_prev = prev_balances.get
 
+    changes = []
     for wallet in current:
-        address = wallet["address"]
-        current_bal = wallet["balance_sol"]
-        prev_bal = prev_balances.get(address, 0)
-
-        delta = current_bal - prev_bal
-        if abs(delta) > 0.01:  # Notable if > 0.01 SOL change
+        prev_bal = get_prev(wallet["address"], 0)
+        delta = wallet["balance_sol"] - prev_bal
+        if abs(delta) > NOTABLE_DELTA_SOL:
             changes.append({
                 "wallet": wallet["label"],
-                "address": address,
+                "address": wallet["address"],
                 "previous": prev_bal,
-                "current": current_bal,
+                "current": wallet["balance_sol"],
                 "delta": delta,
             })
 
@@ -155,9 +208,10 @@ def main():
         log("⚠️  Failed to fetch any wallet balances, skipping snapshot")
         return
 
-    current_snapshot = {"timestamp": datetime.now(timezone.utc).isoformat(), "wallets": current_balances}
+    now = datetime.now(timezone.utc)
+    current_snapshot = {"timestamp": now.isoformat(), "wallets": current_balances}
 
-    save_snapshot(current_snapshot)
+    save_snapshot(current_snapshot, now)
 
     changes = detect_notable_changes(prev_snapshot, current_balances)
 
@@ -168,7 +222,7 @@ def main():
 
         # Save alert to memory
         ALERTS_DIR.mkdir(parents=True, exist_ok=True)
-        alert_file = ALERTS_DIR / f"alert-{today()}.md"
+        alert_file = ALERTS_DIR / f"alert-{now.strftime('%Y-%m-%d')}.md"
         alert_file.write_text(alert_msg)
 
         # Update stats
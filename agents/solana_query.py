@@ -4,15 +4,18 @@ Solana Query Agent — On-chain data fetcher and interpreter.
 Handles /sol price, /sol balance, /sol quote, /sol network commands.
 """
 
-import json
+import hashlib
 import os
+import re
 import sys
+import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from common import (
-    MEMORY_DIR, award_xp, call_llm, gh_post_comment,
-    log, read_prompt, today, update_stats,
+    MEMORY_DIR, archive_write, atomic_write_bytes, award_xp, call_llm, gh_post_comment,
+    http_request, json_dumps, json_loads, log, read_prompt, update_stats,
 )
 
 # ── Solana Constants ─────────────────────────────────────────────────────────
@@ -26,54 +29,162 @@ WELL_KNOWN_MINTS = {
     "RAY": "4k3Dyjzvzp8eMZWUXbBCjEvwSkkk59S5iCNLY3QrkX6R",
     "WIF": "EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm",
 }
+SYMBOL_BY_MINT = {mint: symbol for symbol, mint in WELL_KNOWN_MINTS.items()}
+
+TOKEN_DECIMALS = {
+    "SOL": 9,
+    "USDC": 6,
+    "USDT": 6,
+    "BONK": 5,
+    "JUP": 6,
+    "RAY": 6,
+    "WIF": 6,
+}
 
 DEXSCREENER_API = "https://api.dexscreener.com"
 JUPITER_API = "https://quote-api.jup.ag/v6"
 LAMPORTS_PER_SOL = 1_000_000_000
 
+DEX_CACHE_DIR = MEMORY_DIR / "solana" / "cache"
+DEX_CACHE_TTL = 60  # seconds
+
+# url -> (fetched_at, data)
+_dex_cache: dict[str, tuple[float, dict | list]] = {}
+
+
+# Resolved once at import; the environment doesn't change during a run
+SOLANA_NETWORK = os.environ.get("SOLANA_NETWORK", "mainnet-beta")
+SOLANA_RPC_URL = os.environ.get("SOLANA_RPC_URL", "") or (
+    "https://api.devnet.solana.com" if SOLANA_NETWORK == "devnet"
+    else "https://api.mainnet-beta.solana.com"
+)
+# Primary endpoint first, then any comma-separated failovers, without duplicates
+SOLANA_RPC_URLS = list(dict.fromkeys([
+    SOLANA_RPC_URL,
+    *(url.strip() for url in os.environ.get("SOLANA_RPC_URLS", "").split(",") if url.strip()),
+]))
+
 
 def get_solana_rpc() -> str:
     """Get the configured Solana RPC endpoint."""
-    custom_rpc = os.environ.get("SOLANA_RPC_URL", "")
-    if custom_rpc:
-        return custom_rpc
-    network = os.environ.get("SOLANA_NETWORK", "mainnet-beta")
-    if network == "devnet":
-        return "https://api.devnet.solana.com"
-    return "https://api.mainnet-beta.solana.com"
+    return SOLANA_RPC_URL
 
 
 # ── API Callers ──────────────────────────────────────────────────────────────
 
-def fetch_json(url: str, method: str = "GET", data: bytes | None = None,
-               headers: dict | None = None) -> dict:
-    """Generic JSON fetch helper."""
-    req = urllib.request.Request(url, data=data, method=method)
-    req.add_header("Content-Type", "application/json")
-    if headers:
-        for k, v in headers.items():
-            req.add_header(k, v)
+# Built once and shared by every request (http_request doesn't mutate it)
+JSON_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "GitClaw-SolanaQuery/1.0",
+}
+
+# Rate limits, server errors and timeouts are worth retrying; 4xx otherwise isn't
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRY_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+RPC_MAX_ATTEMPTS = 3
+
+
+def _fetch_json_once(url: str, method: str, data: bytes | None,
+                     headers: dict | None) -> tuple[dict | list, bool]:
+    """Make one JSON request. Returns (result_or_error_dict, retryable)."""
+    all_headers = {**JSON_HEADERS, **headers} if headers else JSON_HEADERS
     try:
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read())
+        status, body = http_request(url, method=method, body=data, headers=all_headers)
+    except OSError as e:  # Network failure or timeout
+        return {"error": str(e)}, True
     except Exception as e:
-        return {"error": str(e)}
+        return {"error": str(e)}, False
+    if status >= 400:
+        return {"error": f"HTTP Error {status}"}, status in RETRYABLE_STATUS
+    try:
+        return json_loads(body), False
+    except ValueError as e:
+        return {"error": str(e)}, False
+
+
+def fetch_json(url: str, method: str = "GET", data: bytes | None = None,
+               headers: dict | None = None, retries: int = 0) -> dict | list:
+    """Generic JSON fetch helper over a pooled keep-alive connection.
+
+    Transient failures are retried up to `retries` times with exponential
+    backoff. Returns an error dict once attempts are exhausted.
+    """
+    backoff = RETRY_BACKOFF
+    for attempt in range(retries + 1):
+        result, retryable = _fetch_json_once(url, method, data, headers)
+        if not retryable or attempt == retries:
+            return result
+        time.sleep(backoff)
+        backoff *= 2
+    return result
+
+
+def rpc_post(payload: bytes) -> dict | list:
+    """POST a JSON-RPC payload, failing over across SOLANA_RPC_URLS.
+
+    Each retryable failure backs off and moves on to the next endpoint,
+    for at most RPC_MAX_ATTEMPTS attempts in total.
+    """
+    backoff = RETRY_BACKOFF
+    for attempt in range(RPC_MAX_ATTEMPTS):
+        url = SOLANA_RPC_URLS[attempt % len(SOLANA_RPC_URLS)]
+        result, retryable = _fetch_json_once(url, "POST", payload, None)
+        if not retryable:
+            return result
+        if attempt < RPC_MAX_ATTEMPTS - 1:
+            log("Solana Query", f"RPC attempt {attempt + 1} failed: {result['error']}, retrying")
+            time.sleep(backoff)
+            backoff *= 2
+    return result
+
+
+def cached_fetch_json(url: str, ttl: float = DEX_CACHE_TTL) -> dict | list:
+    """Fetch JSON through a short-TTL cache shared by the Solana agents.
+
+    Hits are served from memory within a process, and from files under
+    DEX_CACHE_DIR (fresh by mtime) across separate agent runs, so a query
+    right after a monitor sweep reuses its price lookups.
+    """
+    now = time.time()
+    cached = _dex_cache.get(url)
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+
+    key = hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+    cache_file = DEX_CACHE_DIR / f"{key}.json"
+    try:
+        fetched_at = cache_file.stat().st_mtime
+        if now - fetched_at < ttl:
+            data = json_loads(cache_file.read_bytes())
+            _dex_cache[url] = (fetched_at, data)
+            return data
+    except (OSError, ValueError):
+        pass
+
+    data = fetch_json(url, retries=2)
+    if not (isinstance(data, dict) and "error" in data):
+        _dex_cache[url] = (now, data)
+        try:
+            atomic_write_bytes(cache_file, json_dumps(data))
+        except OSError as e:
+            log("Solana Query", f"Failed to write price cache: {e}")
+    return data
 
 
 def dex_search(query: str) -> dict:
-    """Search Dexscreener for a token/pair."""
+    """Search Dexscreener for a token/pair (cached, see cached_fetch_json)."""
     encoded = urllib.request.quote(query)
-    return fetch_json(f"{DEXSCREENER_API}/latest/dex/search?q={encoded}")
+    return cached_fetch_json(f"{DEXSCREENER_API}/latest/dex/search?q={encoded}")
 
 
 def dex_get_pair(chain_id: str, pair_address: str) -> dict:
-    """Get specific pair data from Dexscreener."""
-    return fetch_json(f"{DEXSCREENER_API}/latest/dex/pairs/{chain_id}/{pair_address}")
+    """Get specific pair data from Dexscreener (cached)."""
+    return cached_fetch_json(f"{DEXSCREENER_API}/latest/dex/pairs/{chain_id}/{pair_address}")
 
 
-def dex_get_token_pairs(chain_id: str, token_address: str) -> dict:
-    """Get all pairs for a token."""
-    return fetch_json(f"{DEXSCREENER_API}/token-pairs/v1/{chain_id}/{token_address}")
+def dex_get_token_pairs(chain_id: str, token_address: str) -> dict | list:
+    """Get all pairs for a token (cached)."""
+    return cached_fetch_json(f"{DEXSCREENER_API}/token-pairs/v1/{chain_id}/{token_address}")
 
 
 def jupiter_quote(input_mint: str, output_mint: str, amount: int,
@@ -87,11 +198,31 @@ def jupiter_quote(input_mint: str, output_mint: str, amount: int,
 
 def rpc_call(method: str, params: list) -> dict:
     """Make a Solana JSON-RPC call."""
-    payload = json.dumps({
+    payload = json_dumps({
         "jsonrpc": "2.0", "id": 1,
         "method": method, "params": params,
-    }).encode()
-    return fetch_json(get_solana_rpc(), method="POST", data=payload)
+    })
+    return rpc_post(payload)
+
+
+def rpc_batch(calls: list[tuple[str, list]]) -> list[dict]:
+    """Make several Solana JSON-RPC calls in one HTTP round trip.
+
+    Returns one response dict per call, in call order. Batch responses may
+    arrive in any order, so they are matched back up by id.
+    """
+    payload = json_dumps([
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ])
+    responses = rpc_post(payload)
+    if not isinstance(responses, list):
+        # Transport failure or a non-batch error object
+        error = responses.get("error", "invalid batch response")
+        return [{"error": error} for _ in calls]
+
+    by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+    return [by_id.get(i, {"error": "missing response"}) for i in range(len(calls))]
 
 
 def get_balance(pubkey: str) -> float:
@@ -121,9 +252,33 @@ def get_slot() -> int:
 
 # ── Query Handlers ───────────────────────────────────────────────────────────
 
+_QUOTE_RE = re.compile(r"^(\S+)\s+(\S+)\s+(\S+)$")
+
+
+def extract_pairs(data: dict | list) -> list[dict]:
+    """Normalize Dexscreener responses (search, pair, token-pairs) to a pair list."""
+    if isinstance(data, list):
+        return data
+    pairs = data.get("pairs", data.get("pair", []))
+    if isinstance(pairs, dict):
+        pairs = [pairs]
+    return pairs or []
+
+
+PAIR_FMT = (
+    "**{base}/{quote}** on {dex}\n"
+    "- Price: **${price}**\n"
+    "- 24h Change: {change_24h}%\n"
+    "- 24h Volume: ${volume_24h}\n"
+    "- Liquidity: ${liquidity}\n"
+)
+
+
 def handle_price(args: str) -> str:
     """Handle /sol price <token> queries."""
     token = args.strip().upper() if args.strip() else "SOL"
+    # A well-known mint address resolves to its symbol (mints are case-sensitive)
+    token = SYMBOL_BY_MINT.get(args.strip(), token)
     log("Solana Query", f"Price check: {token}")
 
     # Try mint address first, then search
@@ -136,30 +291,24 @@ def handle_price(args: str) -> str:
         return f"Failed to fetch price data: {data['error']}"
 
     # Extract top pairs
-    pairs = data.get("pairs", data.get("pair", []))
-    if isinstance(pairs, dict):
-        pairs = [pairs]
+    pairs = extract_pairs(data)
     if not pairs:
         return f"No trading pairs found for: {token}"
 
     # Format top 3 pairs
     lines = [f"## 🌐 Price Check: {token}\n"]
-    for pair in pairs[:3]:
-        base = pair.get("baseToken", {})
-        quote = pair.get("quoteToken", {})
-        price = pair.get("priceUsd", "N/A")
-        change_24h = pair.get("priceChange", {}).get("h24", "N/A")
-        volume_24h = pair.get("volume", {}).get("h24", "N/A")
-        liquidity = pair.get("liquidity", {}).get("usd", "N/A")
-        dex = pair.get("dexId", "Unknown")
-
-        lines.append(
-            f"**{base.get('symbol', '?')}/{quote.get('symbol', '?')}** on {dex}\n"
-            f"- Price: **${price}**\n"
-            f"- 24h Change: {change_24h}%\n"
-            f"- 24h Volume: ${volume_24h}\n"
-            f"- Liquidity: ${liquidity}\n"
+    lines.extend(
+        PAIR_FMT.format(
+            base=pair.get("baseToken", {}).get("symbol", "?"),
+            quote=pair.get("quoteToken", {}).get("symbol", "?"),
+            dex=pair.get("dexId", "Unknown"),
+            price=pair.get("priceUsd", "N/A"),
+            change_24h=pair.get("priceChange", {}).get("h24", "N/A"),
+            volume_24h=pair.get("volume", {}).get("h24", "N/A"),
+            liquidity=pair.get("liquidity", {}).get("usd", "N/A"),
         )
+        for pair in pairs[:3]
+    )
 
     return "\n".join(lines)
 
@@ -172,19 +321,26 @@ def handle_balance(args: str) -> str:
 
     log("Solana Query", f"Balance check: {address[:8]}...")
 
-    balance = get_balance(address)
+    # Balance (RPC) and SOL price (Dexscreener) are independent — fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        balance_future = ex.submit(get_balance, address)
+        sol_data_future = ex.submit(dex_get_token_pairs, "solana", WELL_KNOWN_MINTS["SOL"])
+        balance, sol_data = balance_future.result(), sol_data_future.result()
 
-    # Try to get SOL price for USD estimate
-    sol_data = dex_search("SOL")
+    # Try to get SOL price for USD estimate. Pairs for the SOL mint come
+    # sorted by liquidity, so the first one quoting SOL as base is the price.
     sol_price = 0.0
-    pairs = sol_data.get("pairs", [])
-    for p in pairs:
-        if p.get("baseToken", {}).get("symbol") == "SOL":
-            try:
-                sol_price = float(p.get("priceUsd", 0))
-            except (ValueError, TypeError):
-                pass
-            break
+    sol_mint = WELL_KNOWN_MINTS["SOL"]
+    pair = next(
+        (p for p in extract_pairs(sol_data)
+         if p.get("baseToken", {}).get("address") == sol_mint),
+        None,
+    )
+    if pair:
+        try:
+            sol_price = float(pair.get("priceUsd", 0))
+        except (ValueError, TypeError):
+            pass
 
     usd_value = balance * sol_price if sol_price > 0 else None
 
@@ -195,30 +351,31 @@ def handle_balance(args: str) -> str:
     ]
     if usd_value is not None:
         lines.append(f"**USD Value:** ~${usd_value:,.2f} (@ ${sol_price:,.2f}/SOL)\n")
-    lines.append(f"**Network:** {os.environ.get('SOLANA_NETWORK', 'mainnet-beta')}\n")
+    lines.append(f"**Network:** {SOLANA_NETWORK}\n")
 
     return "\n".join(lines)
 
 
 def handle_quote(args: str) -> str:
     """Handle /sol quote <from> <to> <amount> queries."""
-    parts = args.strip().split()
-    if len(parts) < 3:
+    m = _QUOTE_RE.match(args.strip())
+    if not m:
         return "Usage: `/sol quote <from_token> <to_token> <amount>`\nExample: `/sol quote SOL USDC 1`"
 
-    from_token = parts[0].upper()
-    to_token = parts[1].upper()
+    from_token, to_token, amount_str = m.groups()
+    from_token = from_token.upper()
+    to_token = to_token.upper()
     try:
-        amount = float(parts[2])
+        amount = float(amount_str)
     except ValueError:
-        return f"Invalid amount: {parts[2]}"
+        return f"Invalid amount: {amount_str}"
 
     # Resolve mint addresses
     from_mint = WELL_KNOWN_MINTS.get(from_token, from_token)
     to_mint = WELL_KNOWN_MINTS.get(to_token, to_token)
 
-    # Convert to lamports/smallest unit (assume SOL-like 9 decimals)
-    amount_raw = int(amount * LAMPORTS_PER_SOL)
+    # Convert to the token's smallest unit (unknown mints assumed SOL-like)
+    amount_raw = int(amount * 10 ** TOKEN_DECIMALS.get(from_token, 9))
 
     log("Solana Query", f"Quote: {amount} {from_token} -> {to_token}")
 
@@ -228,11 +385,7 @@ def handle_quote(args: str) -> str:
         return f"Jupiter quote failed: {data['error']}"
 
     out_amount = int(data.get("outAmount", 0))
-    # Assume 6 decimals for USDC/USDT, 9 for SOL
-    if to_token in ("USDC", "USDT"):
-        out_human = out_amount / 1_000_000
-    else:
-        out_human = out_amount / LAMPORTS_PER_SOL
+    out_human = out_amount / 10 ** TOKEN_DECIMALS.get(to_token, 9)
 
     price_impact = data.get("priceImpactPct", "0")
     slippage = data.get("slippageBps", 50)
@@ -254,15 +407,20 @@ def handle_network(_args: str) -> str:
     """Handle /sol network status queries."""
     log("Solana Query", "Network status check")
 
-    slot = get_slot()
-    blockhash = get_latest_blockhash()
-    perf = get_network_performance(3)
+    slot_resp, blockhash_resp, perf_resp = rpc_batch([
+        ("getSlot", []),
+        ("getLatestBlockhash", []),
+        ("getRecentPerformanceSamples", [3]),
+    ])
+    slot = slot_resp.get("result", 0)
+    blockhash = blockhash_resp.get("result", {}).get("value", {}).get("blockhash", "")
+    perf = perf_resp.get("result", [])
 
     lines = [
         f"## 🌐 Solana Network Status\n",
         f"**Current Slot:** {slot:,}\n",
         f"**Latest Blockhash:** `{blockhash[:16]}...`\n",
-        f"**Network:** {os.environ.get('SOLANA_NETWORK', 'mainnet-beta')}\n",
+        f"**Network:** {SOLANA_NETWORK}\n",
     ]
 
     if perf:
@@ -278,6 +436,15 @@ def handle_network(_args: str) -> str:
 
 # ── Main ─────────────────────────────────────────────────────────────────────
 
+def record_query(command: str, args: str, raw_data: str) -> None:
+    """Archive a query's raw data and count it in stats."""
+    now = datetime.now(timezone.utc)
+    archive_file = MEMORY_DIR / "solana" / "prices" / f"{now.strftime('%Y-%m-%d')}-{command}.md"
+    ts = now.strftime("%H:%M UTC")
+    archive_write(archive_file, f"\n---\n### {ts} — {command} {args}\n\n{raw_data}\n")
+    update_stats("solana_queries")
+
+
 HANDLERS = {
     "price": handle_price,
     "balance": handle_balance,
@@ -314,34 +481,35 @@ def main():
     # Get raw data
     raw_data = handler(args)
 
-    # Pass through LLM for entertaining commentary
-    try:
-        system_prompt = read_prompt("solana-query")
-        user_message = (
-            f"Query type: {command}\n"
-            f"Query args: {args}\n"
-            f"Style: {solana_style}\n\n"
-            f"Raw data:\n{raw_data}\n\n"
-            f"Add entertaining commentary to this data. Keep the actual numbers "
-            f"accurate — embellish the narrative, not the data."
-        )
-        response = call_llm(system_prompt, user_message, max_tokens=1200)
-    except Exception as e:
-        log("Solana Query", f"LLM commentary failed: {e}, using raw data")
-        response = raw_data + "\n\n— 🌐 *Solana Query Agent | NFA*"
-
-    # Post and archive
-    if issue_number > 0:
-        gh_post_comment(issue_number, response)
+    # Archiving and stats don't depend on the LLM's output — do them while it runs
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        bookkeeping = ex.submit(record_query, command, args, raw_data)
+
+        # Pass through LLM for entertaining commentary
+        try:
+            system_prompt = read_prompt("solana-query")
+            user_message = (
+                f"Query type: {command}\n"
+                f"Query args: {args}\n"
+                f"Style: {solana_style}\n\n"
+                f"Raw data:\n{raw_data}\n\n"
+                f"Add entertaining commentary to this data. Keep the actual numbers "
+                f"accurate — embellish the narrative, not the data."
+            )
+            response = call_llm(system_prompt, user_message, max_tokens=1200)
+        except Exception as e:
+            log("Solana Query", f"LLM commentary failed: {e}, using raw data")
+            response = raw_data + "\n\n— 🌐 *Solana Query Agent | NFA*"
+
+        # Post before joining so a bookkeeping failure can't hold back the reply
+        if issue_number > 0:
+            gh_post_comment(issue_number, response)
 
-    archive_dir = MEMORY_DIR / "solana" / "prices"
-    archive_dir.mkdir(parents=True, exist_ok=True)
-    archive_file = archive_dir / f"{today()}-{command}.md"
-    with open(archive_file, "a") as f:
-        ts = datetime.now(timezone.utc).strftime("%H:%M UTC")
-        f.write(f"\n---\n### {ts} — {command} {args}\n\n{raw_data}\n")
+        try:
+            bookkeeping.result()
+        except Exception as e:
+            log("Solana Query", f"Failed to archive query: {e}")
 
-    update_stats("solana_queries")
     award_xp(10)
 
     print(response)
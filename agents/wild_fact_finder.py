@@ -5,13 +5,17 @@ Triggered by /research command.
 """
 
 import os
+import re
 from datetime import datetime, timezone
 
 from common import (
-    MEMORY_DIR, append_memory, award_xp, call_llm,
-    gh_post_comment, log, read_prompt, today, update_stats,
+    MEMORY_DIR, append_memory, atomic_write_text, award_xp, call_llm,
+    gh_post_comment, log, read_prompt, update_stats,
 )
 
+# Anything but letters, digits (any script) and hyphens, like str.isalnum()
+_SLUG_RE = re.compile(r"(?:[^\w-]|_)+")
+
 
 def main():
     topic = os.environ.get("RESEARCH_TOPIC", "the meaning of life")
@@ -20,12 +24,15 @@ def main():
 
     log("Wild Fact Finder", f"Researching: {topic}")
 
+    now = datetime.now(timezone.utc)
+    date_str = now.strftime("%Y-%m-%d")
+
     system_prompt = read_prompt("wild-fact-finder")
 
     user_message = f"""Research topic: {topic}
 
 Requested by: @{requester}
-Date: {today()}
+Date: {date_str}
 
 Provide a thorough, entertaining research brief. Include:
 1. Key findings with confidence levels
@@ -53,16 +60,15 @@ This topic deserves a deep dive. Try again in a bit, and I'll have a full brief
         gh_post_comment(issue_number, response)
 
     # Archive
-    slug = topic.lower().replace(" ", "-")[:50]
-    slug = "".join(c for c in slug if c.isalnum() or c == "-")
-    archive_path = MEMORY_DIR / "research" / f"{today()}-{slug}.md"
-    archive_path.parent.mkdir(parents=True, exist_ok=True)
-    archive_path.write_text(
+    slug = _SLUG_RE.sub("", topic.lower().replace(" ", "-"))[:50]
+    archive_path = MEMORY_DIR / "research" / f"{date_str}-{slug}.md"
+    content = (
         f"# Research: {topic}\n"
-        f"_Researched on {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}_\n"
+        f"_Researched on {now.strftime('%Y-%m-%d %H:%M UTC')}_\n"
         f"_Requested by: @{requester}_\n\n"
         f"{response}\n"
     )
+    atomic_write_text(archive_path, content)
 
     update_stats("researches_completed")
     award_xp(15)